@@ -1,22 +1,78 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Set, Tuple
 import asyncio
+import heapq
+import logging
+import random
+import re
+import time
 import aiohttp
-from datetime import datetime
+import httpx
+import orjson
+from collections import OrderedDict
 
 from actors.base_actor import BaseActor
 from actors.messages import ActorMessage, MESSAGE_TYPES
 from config.messages import USER_MESSAGES
 from config.settings import (
+    DAILY_MESSAGE_LIMIT,
     TELEGRAM_BOT_TOKEN,
     TELEGRAM_POLLING_TIMEOUT,
     TELEGRAM_TYPING_UPDATE_INTERVAL,
     TELEGRAM_MAX_MESSAGE_LENGTH,
-    TELEGRAM_TYPING_CLEANUP_THRESHOLD,
     TELEGRAM_API_DEFAULT_TIMEOUT,
-    TELEGRAM_MAX_TYPING_TASKS
+    TELEGRAM_MAX_TYPING_TASKS,
+    TELEGRAM_UPDATE_WORKERS,
+    TELEGRAM_UPDATE_QUEUE_SIZE,
+    TELEGRAM_POLL_CONNECTION_LIMIT,
+    TELEGRAM_API_CONNECTION_LIMIT,
+    TELEGRAM_POLLING_RETRY_DELAY,
+    TELEGRAM_POLLING_RETRY_MAX_DELAY,
+    TELEGRAM_POLLING_RETRY_WARNING_DELAY
 )
 from utils.monitoring import measure_latency
 
+# Часть параграфа не длиннее лимита Telegram: по границе пробела,
+# а если пробелов нет - жестко по длине
+_MESSAGE_PART_RE = re.compile(
+    r".{1,%d}(?:\s|$)|.{1,%d}" % (
+        TELEGRAM_MAX_MESSAGE_LENGTH - 1,
+        TELEGRAM_MAX_MESSAGE_LENGTH
+    ),
+    re.DOTALL
+)
+
+# Актор, принимающий сообщения пользователей и ответы бота
+_USER_SESSION_ID = "user_session"
+
+# Типы сообщений, используемые на каждом сообщении
+_MT_PROCESS_USER = MESSAGE_TYPES['PROCESS_USER_MESSAGE']
+_MT_USER = MESSAGE_TYPES['USER_MESSAGE']
+_MT_BOT_RESPONSE = MESSAGE_TYPES['BOT_RESPONSE']
+_MT_ERROR = MESSAGE_TYPES['ERROR']
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Максимальная длина строкового значения для form-urlencoded: percent-encoding
+# раздувает не-ASCII текст втрое, длинные тексты выгоднее отправлять JSON
+_FORM_MAX_VALUE_LENGTH = 64
+
+# Общий результат для холостых циклов long polling (не изменять)
+_EMPTY_UPDATES: list = []
+
+# Ответы на команды бота, тексты форматируются один раз при импорте
+_WELCOME_TEXT = USER_MESSAGES["welcome"].format(
+    DAILY_MESSAGE_LIMIT=DAILY_MESSAGE_LIMIT
+)
+_COMMAND_HANDLERS = {
+    "start": _WELCOME_TEXT,
+}
+
+# Спецсимволы разметки Telegram Markdown (legacy parse_mode)
+_MARKDOWN_SPECIAL_RE = re.compile(r"[*_`\[]")
+
+# Команда вида /start, /start@bot_name или /start аргументы
+_COMMAND_RE = re.compile(r"^/(\w+)(?:@(\w+))?(?:\s+(.*))?$", re.DOTALL)
+
 
 class TelegramInterfaceActor(BaseActor):
     """
@@ -26,25 +82,69 @@ class TelegramInterfaceActor(BaseActor):
     
     def __init__(self):
         super().__init__("telegram", "Telegram")
-        self._session: Optional[aiohttp.ClientSession] = None
+        # Ссылка на ActorSystem, задается через set_actor_system при регистрации.
+        # Используется напрямую, без вызова get_actor_system() на каждом сообщении
+        self._actor_system = None
+        # Отдельные пулы соединений: долгий getUpdates (aiohttp) не должен
+        # блокировать отправку ответов пользователям (httpx, HTTP/2)
+        self._poll_session: Optional[aiohttp.ClientSession] = None
+        self._api_client: Optional[httpx.AsyncClient] = None
         self._update_offset = 0
         self._polling_task: Optional[asyncio.Task] = None
-        self._typing_tasks: Dict[int, asyncio.Task] = {}  # chat_id -> task
+        # Своя очередь у каждого обработчика: обновления одного чата всегда
+        # попадают в одну очередь и обрабатываются по порядку
+        self._update_queues: List[asyncio.Queue] = [
+            asyncio.Queue(maxsize=TELEGRAM_UPDATE_QUEUE_SIZE)
+            for _ in range(TELEGRAM_UPDATE_WORKERS)
+        ]
+        self._update_workers: List[asyncio.Task] = []
+        # Чаты с активным typing индикатором: chat_id -> поколение запуска.
+        # Порядок ключей - от самого старого запуска к самому новому
+        self._typing_chats: OrderedDict[int, int] = OrderedDict()
+        self._typing_generation = 0
+        # Куча дедлайнов (время отправки, chat_id, поколение) для одной задачи
+        self._typing_heap: List[Tuple[float, int, int]] = []
+        self._typing_wakeup = asyncio.Event()
+        self._typing_task: Optional[asyncio.Task] = None
+        # Отправляемые батчи sendChatAction (не блокируют планировщик)
+        self._typing_batches: Set[asyncio.Task] = set()
         self._base_url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}"
-        self._typing_cleanup_counter = 0
+        self._bot_username: Optional[str] = None  # В нижнем регистре, из getMe
+        # Обработчики сообщений от других акторов
+        self._message_handlers = {
+            _MT_PROCESS_USER: self._forward_user_message,
+            _MT_BOT_RESPONSE: self._send_bot_response,
+            _MT_ERROR: self._send_error_message,
+        }
         
     async def initialize(self) -> None:
-        """Инициализация HTTP сессии и запуск polling"""
+        """Инициализация HTTP сессий и запуск polling"""
         if not TELEGRAM_BOT_TOKEN:
             raise ValueError("TELEGRAM_BOT_TOKEN not set in config/settings.py")
             
-        self._session = aiohttp.ClientSession()
+        # Ограничиваем пулы соединений, чтобы соединения переиспользовались
+        # между запросами (keep-alive по умолчанию)
+        self._poll_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=TELEGRAM_POLL_CONNECTION_LIMIT)
+        )
+        self._api_client = httpx.AsyncClient(
+            http2=True,
+            base_url=self._base_url,
+            timeout=TELEGRAM_API_DEFAULT_TIMEOUT,
+            limits=httpx.Limits(max_connections=TELEGRAM_API_CONNECTION_LIMIT)
+        )
         
         # Проверяем токен
         me = await self._api_call("getMe")
-        self.logger.info(f"Connected as @{me['result']['username']}")
+        self._bot_username = me['result']['username'].lower()
+        self.logger.info("Connected as @%s", me['result']['username'])
         
-        # Запускаем polling
+        # Запускаем typing индикаторы, обработчиков обновлений и polling
+        self._typing_task = asyncio.create_task(self._typing_scheduler())
+        self._update_workers = [
+            asyncio.create_task(self._update_worker(queue))
+            for queue in self._update_queues
+        ]
         self._polling_task = asyncio.create_task(self._polling_loop())
         
         self.logger.info("TelegramInterfaceActor initialized")
@@ -58,77 +158,108 @@ class TelegramInterfaceActor(BaseActor):
                 await self._polling_task
             except asyncio.CancelledError:
                 pass
-                
-        # Останавливаем все typing индикаторы
-        for task in self._typing_tasks.values():
+        
+        # Message loop к этому моменту уже остановлен, поэтому обработанные
+        # сейчас сообщения некому доставить - отбрасываем очереди с учетом
+        dropped = sum(queue.qsize() for queue in self._update_queues)
+        if dropped:
+            self.logger.warning("Dropped %d unprocessed updates on shutdown", dropped)
+        
+        # Останавливаем обработчиков обновлений и typing индикаторы
+        background_tasks = list(self._update_workers)
+        if self._typing_task:
+            background_tasks.append(self._typing_task)
+        background_tasks.extend(self._typing_batches)
+        for task in background_tasks:
             task.cancel()
             
-        # Очищаем словарь
-        self._typing_tasks.clear()
+        # Дожидаемся отмены, чтобы не осталось запросов к закрытым сессиям
+        await asyncio.gather(*background_tasks, return_exceptions=True)
         
-        # Закрываем HTTP сессию
-        if self._session:
-            await self._session.close()
+        self._update_workers.clear()
+        self._typing_task = None
+        self._typing_batches.clear()
+        self._typing_chats.clear()
+        self._typing_heap.clear()
+        
+        # Закрываем HTTP клиенты, даже если сам shutdown будет отменен
+        closers = []
+        if self._poll_session:
+            closers.append(self._poll_session.close())
+        if self._api_client:
+            closers.append(self._api_client.aclose())
+        if closers:
+            await asyncio.shield(asyncio.gather(*closers))
             
         self.logger.info("TelegramInterfaceActor shutdown")
         
     @measure_latency
     async def handle_message(self, message: ActorMessage) -> Optional[ActorMessage]:
         """Обработка сообщений от других акторов"""
-        
-        # Новое сообщение от Telegram для обработки
-        if message.message_type == MESSAGE_TYPES['PROCESS_USER_MESSAGE']:
-            # Извлекаем данные и отправляем в UserSessionActor
-            user_msg = ActorMessage.create(
-                sender_id=self.actor_id,
-                message_type=MESSAGE_TYPES['USER_MESSAGE'],
-                payload=message.payload
-            )
-            
-            # Отправляем в UserSessionActor через ActorSystem
-            if self.get_actor_system():
-                await self.get_actor_system().send_message("user_session", user_msg)
-            
-        # Ответ бота готов
-        elif message.message_type == MESSAGE_TYPES['BOT_RESPONSE']:
-            await self._send_bot_response(message)
-            
-        # Ошибка генерации
-        elif message.message_type == MESSAGE_TYPES['ERROR']:
-            await self._send_error_message(message)
-            
-        # Streaming чанк (для будущего)
-        elif message.message_type == MESSAGE_TYPES['STREAMING_CHUNK']:
-            # TODO: Реализовать в следующих этапах
-            pass
+        handler = self._message_handlers.get(message.message_type)
+        if handler:
+            await handler(message)
             
         return None
     
+    async def _forward_user_message(self, message: ActorMessage) -> None:
+        """Передача нового сообщения от Telegram в UserSessionActor"""
+        # Извлекаем данные и отправляем в UserSessionActor
+        user_msg = ActorMessage.create(
+            sender_id=self.actor_id,
+            message_type=_MT_USER,
+            payload=message.payload
+        )
+        
+        # Отправляем в UserSessionActor через ActorSystem
+        actor_system = self._actor_system
+        if actor_system:
+            await actor_system.send_message(_USER_SESSION_ID, user_msg)
+    
     async def _polling_loop(self) -> None:
-        """Основной цикл получения обновлений от Telegram"""
+        """
+        Основной цикл получения обновлений от Telegram.
+        Только складывает обновления в очередь, не дожидаясь их обработки,
+        чтобы следующий long polling запрос уходил сразу.
+        """
         self.logger.info("Started Telegram polling")
+        retry_delay = TELEGRAM_POLLING_RETRY_DELAY
         
         while self.is_running:
             try:
                 # Получаем обновления
                 updates = await self._get_updates()
+                retry_delay = TELEGRAM_POLLING_RETRY_DELAY
                 
-                # Обрабатываем каждое обновление
+                # Передаем обработчикам, распределяя по чатам
                 for update in updates:
-                    await self._process_update(update)
+                    await self._update_queue_for(update).put(update)
                     
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                self.logger.error(f"Polling error: {str(e)}")
-                await asyncio.sleep(5)  # Пауза перед переподключением
+                self.logger.error("Polling error: %s", e)
+                
+                # Пауза перед переподключением: exponential backoff с jitter,
+                # чтобы экземпляры бота не переподключались одновременно
+                if retry_delay > TELEGRAM_POLLING_RETRY_WARNING_DELAY:
+                    self.logger.warning(
+                        "Telegram API unavailable, retrying polling in %.0fs",
+                        retry_delay
+                    )
+                await asyncio.sleep(retry_delay + random.uniform(0, retry_delay * 0.5))
+                retry_delay = min(retry_delay * 2, TELEGRAM_POLLING_RETRY_MAX_DELAY)
                 
         self.logger.info("Stopped Telegram polling")
     
     async def _get_updates(self) -> list:
-        """Получение обновлений через long polling"""
+        """
+        Получение обновлений через long polling.
+        Остальные ошибки пробрасываются в _polling_loop, который их логирует
+        и выдерживает паузу перед повтором.
+        """
         try:
-            result = await self._api_call(
+            result = await self._poll_call(
                 "getUpdates",
                 params={
                     "offset": self._update_offset,
@@ -138,19 +269,34 @@ class TelegramInterfaceActor(BaseActor):
                 timeout=TELEGRAM_POLLING_TIMEOUT + 5
             )
             
-            updates = result.get("result", [])
+            updates = result.get("result")
+            if not updates:
+                return _EMPTY_UPDATES
             
             # Обновляем offset
-            if updates:
-                self._update_offset = updates[-1]["update_id"] + 1
+            self._update_offset = updates[-1]["update_id"] + 1
                 
             return updates
             
         except asyncio.TimeoutError:
-            return []  # Нормальная ситуация для long polling
-        except Exception as e:
-            self.logger.error(f"Failed to get updates: {str(e)}")
-            return []
+            return _EMPTY_UPDATES  # Нормальная ситуация для long polling
+    
+    def _update_queue_for(self, update: Dict[str, Any]) -> asyncio.Queue:
+        """Очередь обработчика для обновления (по chat_id)"""
+        message = update.get("message") or {}
+        chat_id = message.get("chat", {}).get("id", 0)
+        return self._update_queues[chat_id % len(self._update_queues)]
+    
+    async def _update_worker(self, queue: asyncio.Queue) -> None:
+        """Обработчик обновлений из своей очереди"""
+        while True:
+            update = await queue.get()
+            try:
+                await self._process_update(update)
+            except Exception as e:
+                self.logger.error(
+                    "Failed to process update %s: %s", update.get('update_id'), e
+                )
     
     async def _process_update(self, update: Dict[str, Any]) -> None:
         """Обработка одного обновления от Telegram"""
@@ -170,8 +316,13 @@ class TelegramInterfaceActor(BaseActor):
             return
             
         # Обработка команд
-        if text.startswith("/"):
-            await self._handle_command(chat_id, text)
+        command_match = _COMMAND_RE.match(text)
+        if command_match:
+            # Команды, адресованные другим ботам в группе, игнорируем
+            mention = command_match.group(2)
+            if mention and mention.lower() != self._bot_username:
+                return
+            await self._handle_command(chat_id, command_match.group(1))
             return
             
         # Запускаем typing индикатор
@@ -180,32 +331,30 @@ class TelegramInterfaceActor(BaseActor):
         # Создаем сообщение для обработки через Actor System
         process_msg = ActorMessage.create(
             sender_id=self.actor_id,
-            message_type=MESSAGE_TYPES['PROCESS_USER_MESSAGE'],
+            message_type=_MT_PROCESS_USER,
             payload={
                 'user_id': str(user_id),
                 'chat_id': chat_id,
                 'username': username,
                 'text': text,
-                'timestamp': datetime.now().isoformat()
+                # Для упорядочивания внутри процесса, не для отображения
+                'timestamp_ns': time.monotonic_ns()
             }
         )
         
         # Отправляем себе же для обработки через Actor System
-        if self.get_actor_system():
-            await self.get_actor_system().send_message(self.actor_id, process_msg)
+        actor_system = self._actor_system
+        if actor_system:
+            await actor_system.send_message(self.actor_id, process_msg)
         
-        self.logger.debug(f"Queued message from user {user_id}: {text[:50]}...")
+        # Срез текста не создаем, если debug логирование выключено
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Queued message from user %s: %s...", user_id, text[:50])
     
     async def _handle_command(self, chat_id: int, command: str) -> None:
-        """Обработка команд бота"""
-        if command == "/start":
-            from config.settings import DAILY_MESSAGE_LIMIT
-            welcome_text = USER_MESSAGES["welcome"].format(
-                DAILY_MESSAGE_LIMIT=DAILY_MESSAGE_LIMIT
-            )
-            await self._send_message(chat_id, welcome_text)
-        else:
-            await self._send_message(chat_id, USER_MESSAGES["unknown_command"])
+        """Обработка команд бота (command - имя команды без '/' и @username)"""
+        text = _COMMAND_HANDLERS.get(command, USER_MESSAGES["unknown_command"])
+        await self._send_message(chat_id, text)
     
     async def _send_bot_response(self, message: ActorMessage) -> None:
         """Отправка ответа бота пользователю"""
@@ -219,8 +368,9 @@ class TelegramInterfaceActor(BaseActor):
         await self._send_message(chat_id, text)
         
         # Пересылаем BOT_RESPONSE в UserSessionActor для сохранения в память
-        if self.get_actor_system():
-            await self.get_actor_system().send_message("user_session", message)
+        actor_system = self._actor_system
+        if actor_system:
+            await actor_system.send_message(_USER_SESSION_ID, message)
     
     async def _send_error_message(self, message: ActorMessage) -> None:
         """Отправка сообщения об ошибке"""
@@ -241,17 +391,22 @@ class TelegramInterfaceActor(BaseActor):
         chunks = self._split_long_message(text)
         
         for chunk in chunks:
+            # Markdown нужен, только если в тексте есть его разметка
+            use_markdown = _MARKDOWN_SPECIAL_RE.search(chunk) is not None
+            data = {
+                "chat_id": chat_id,
+                "text": chunk
+            }
+            if use_markdown:
+                data["parse_mode"] = "Markdown"
+                
             try:
-                await self._api_call(
-                    "sendMessage",
-                    data={
-                        "chat_id": chat_id,
-                        "text": chunk,
-                        "parse_mode": "Markdown"
-                    }
-                )
+                await self._api_call("sendMessage", data=data)
             except Exception as e:
-                self.logger.error(f"Failed to send message to {chat_id}: {str(e)}")
+                self.logger.error("Failed to send message to %s: %s", chat_id, e)
+                if not use_markdown:
+                    continue
+                    
                 # Пробуем без Markdown
                 try:
                     await self._api_call(
@@ -262,100 +417,164 @@ class TelegramInterfaceActor(BaseActor):
                         }
                     )
                 except Exception as e2:
-                    self.logger.error(f"Failed to send plain message: {str(e2)}")
+                    self.logger.error("Failed to send plain message: %s", e2)
     
     def _split_long_message(self, text: str) -> list:
         """Разбивка длинного сообщения на части"""
         if len(text) <= TELEGRAM_MAX_MESSAGE_LENGTH:
             return [text]
             
-        # Разбиваем по параграфам
+        # Разбиваем по параграфам, накапливая их в буфере
         chunks = []
-        current = ""
+        buffer = []
+        buffer_len = 0
         
         for paragraph in text.split("\n\n"):
-            if len(current) + len(paragraph) + 2 > TELEGRAM_MAX_MESSAGE_LENGTH:
-                if current:
-                    chunks.append(current.strip())
-                current = paragraph
-            else:
-                if current:
-                    current += "\n\n"
-                current += paragraph
+            # Слишком длинный параграф режем по пробелам
+            if len(paragraph) > TELEGRAM_MAX_MESSAGE_LENGTH:
+                if buffer:
+                    chunks.append("\n\n".join(buffer).strip())
+                    buffer = []
+                    buffer_len = 0
+                chunks.extend(
+                    part.strip() for part in _MESSAGE_PART_RE.findall(paragraph)
+                )
+                continue
                 
-        if current:
-            chunks.append(current.strip())
+            separator_len = 2 if buffer else 0
+            if buffer_len + separator_len + len(paragraph) > TELEGRAM_MAX_MESSAGE_LENGTH:
+                chunks.append("\n\n".join(buffer).strip())
+                buffer = []
+                buffer_len = 0
+                separator_len = 0
+                
+            buffer.append(paragraph)
+            buffer_len += separator_len + len(paragraph)
+                
+        if buffer:
+            chunks.append("\n\n".join(buffer).strip())
             
-        return chunks
+        # Telegram не принимает пустые сообщения
+        return [chunk for chunk in chunks if chunk]
     
     async def _start_typing(self, chat_id: int) -> None:
         """Запуск typing индикатора"""
-        # Останавливаем предыдущий если есть
-        await self._stop_typing(chat_id)
-        
-        # Периодическая очистка завершенных задач
-        self._typing_cleanup_counter += 1
-        if self._typing_cleanup_counter >= TELEGRAM_TYPING_CLEANUP_THRESHOLD:
-            self._cleanup_typing_tasks()
-            self._typing_cleanup_counter = 0
-        
-        # Проверяем лимит активных typing задач
-        if len(self._typing_tasks) >= TELEGRAM_MAX_TYPING_TASKS:
+        if chat_id in self._typing_chats:
+            self._typing_chats.move_to_end(chat_id)
+            return
+            
+        # Проверяем лимит активных typing индикаторов
+        if len(self._typing_chats) >= TELEGRAM_MAX_TYPING_TASKS:
+            # Удаляем первые 10% чатов (самые старые)
+            to_remove = max(1, len(self._typing_chats) // 10)
+            for _ in range(to_remove):
+                self._typing_chats.popitem(last=False)
             self.logger.warning(
-                f"Typing tasks limit reached ({TELEGRAM_MAX_TYPING_TASKS}), "
-                f"forcing cleanup"
+                "Typing chats limit reached (%d), removed %d oldest typing indicators",
+                TELEGRAM_MAX_TYPING_TASKS,
+                to_remove
             )
-            # Принудительная очистка всех завершенных задач
-            self._cleanup_typing_tasks()
             
-            # Если все еще превышен лимит, удаляем самые старые
-            if len(self._typing_tasks) >= TELEGRAM_MAX_TYPING_TASKS:
-                # Удаляем первые 10% задач (самые старые)
-                to_remove = max(1, len(self._typing_tasks) // 10)
-                for _ in range(to_remove):
-                    oldest_chat_id = next(iter(self._typing_tasks))
-                    self._typing_tasks[oldest_chat_id].cancel()
-                    del self._typing_tasks[oldest_chat_id]
-                self.logger.warning(f"Forcefully removed {to_remove} oldest typing tasks")
+        self._typing_generation += 1
+        self._typing_chats[chat_id] = self._typing_generation
         
-        # Создаем новую задачу
-        self._typing_tasks[chat_id] = asyncio.create_task(
-            self._typing_loop(chat_id)
+        # Первый индикатор отправляем сразу, не дожидаясь других чатов
+        heapq.heappush(
+            self._typing_heap,
+            (time.monotonic(), chat_id, self._typing_generation)
         )
+        self._typing_wakeup.set()
     
     async def _stop_typing(self, chat_id: int) -> None:
-        """Остановка typing индикатора"""
-        if chat_id in self._typing_tasks:
-            self._typing_tasks[chat_id].cancel()
-            del self._typing_tasks[chat_id]
+        """Остановка typing индикатора (запись в куче удаляется лениво)"""
+        self._typing_chats.pop(chat_id, None)
     
-    async def _typing_loop(self, chat_id: int) -> None:
-        """Цикл обновления typing индикатора"""
+    async def _typing_scheduler(self) -> None:
+        """
+        Единый цикл обновления typing индикаторов.
+        Каждый чат обновляется со своим интервалом по куче дедлайнов,
+        задача спит только до ближайшего из них.
+        """
         try:
             while True:
-                await self._api_call(
+                if not self._typing_heap:
+                    await self._typing_wakeup.wait()
+                    self._typing_wakeup.clear()
+                    continue
+                    
+                # Ждем ближайший дедлайн или появление нового чата
+                delay = self._typing_heap[0][0] - time.monotonic()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(
+                            self._typing_wakeup.wait(),
+                            timeout=delay
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+                    self._typing_wakeup.clear()
+                    continue
+                    
+                # Забираем все наступившие дедлайны
+                now = time.monotonic()
+                due_chats = []
+                while self._typing_heap and self._typing_heap[0][0] <= now:
+                    _, chat_id, generation = heapq.heappop(self._typing_heap)
+                    # Пропускаем остановленные и перезапущенные чаты
+                    if self._typing_chats.get(chat_id) != generation:
+                        continue
+                    due_chats.append((chat_id, generation))
+                    heapq.heappush(
+                        self._typing_heap,
+                        (now + TELEGRAM_TYPING_UPDATE_INTERVAL, chat_id, generation)
+                    )
+                    
+                # Отправляем в отдельной задаче: зависший запрос не должен
+                # задерживать обновление остальных чатов
+                if due_chats:
+                    batch = asyncio.create_task(self._send_typing_batch(due_chats))
+                    self._typing_batches.add(batch)
+                    batch.add_done_callback(self._typing_batches.discard)
+        except asyncio.CancelledError:
+            pass
+    
+    async def _send_typing_batch(self, due_chats: List[Tuple[int, int]]) -> None:
+        """Параллельная отправка typing индикатора в несколько чатов (пары chat_id, поколение)"""
+        results = await asyncio.gather(
+            *(
+                self._api_call(
                     "sendChatAction",
                     data={
                         "chat_id": chat_id,
                         "action": "typing"
                     }
                 )
-                await asyncio.sleep(TELEGRAM_TYPING_UPDATE_INTERVAL)
-        except asyncio.CancelledError:
-            pass
-    
-    def _cleanup_typing_tasks(self) -> None:
-        """Очистка завершенных typing задач из словаря"""
-        completed_chats = []
-        for chat_id, task in self._typing_tasks.items():
-            if task.done():
-                completed_chats.append(chat_id)
+                for chat_id, _ in due_chats
+            ),
+            return_exceptions=True
+        )
         
-        for chat_id in completed_chats:
-            del self._typing_tasks[chat_id]
-            
-        if completed_chats:
-            self.logger.debug(f"Cleaned {len(completed_chats)} completed typing tasks")
+        # Для чатов с ошибкой индикатор больше не обновляем. Только если за
+        # время запроса чат не был остановлен и запущен заново
+        for (chat_id, generation), result in zip(due_chats, results):
+            if isinstance(result, Exception):
+                self.logger.debug("Failed to send typing to %s: %s", chat_id, result)
+                if self._typing_chats.get(chat_id) == generation:
+                    self._typing_chats.pop(chat_id)
+    
+    async def _poll_call(
+        self,
+        method: str,
+        params: Optional[Dict] = None,
+        timeout: Optional[int] = None
+    ) -> Dict:
+        """Вызов Telegram API через отдельную сессию для long polling"""
+        async with self._poll_session.post(
+            f"{self._base_url}/{method}",
+            params=params,
+            timeout=timeout or TELEGRAM_API_DEFAULT_TIMEOUT
+        ) as response:
+            return self._check_result(orjson.loads(await response.read()))
     
     async def _api_call(
         self, 
@@ -364,18 +583,47 @@ class TelegramInterfaceActor(BaseActor):
         params: Optional[Dict] = None,
         timeout: Optional[int] = None
     ) -> Dict:
-        """Базовый метод для вызова Telegram API"""
-        url = f"{self._base_url}/{method}"
+        """
+        Базовый метод для исходящих вызовов Telegram API.
+        Использует HTTP/2 клиент: все запросы мультиплексируются
+        в одном TLS соединении.
+        """
+        # Небольшие плоские данные (sendChatAction) отправляем как
+        # form-urlencoded, остальное - как JSON через orjson вместо stdlib json
+        if data is None:
+            body = {}
+        elif self._is_form_payload(data):
+            body = {"data": data}
+        else:
+            body = {"content": orjson.dumps(data), "headers": _JSON_HEADERS}
         
-        async with self._session.post(
-            url,
-            json=data,
+        response = await self._api_client.post(
+            f"/{method}",
             params=params,
-            timeout=timeout or TELEGRAM_API_DEFAULT_TIMEOUT
-        ) as response:
-            result = await response.json()
+            timeout=timeout or TELEGRAM_API_DEFAULT_TIMEOUT,
+            **body
+        )
+        return self._check_result(orjson.loads(response.content))
+    
+    @staticmethod
+    def _check_result(result: Dict) -> Dict:
+        """Проверка ответа Telegram API"""
+        if not result.get("ok"):
+            raise Exception(f"Telegram API error: {result}")
             
-            if not result.get("ok"):
-                raise Exception(f"Telegram API error: {result}")
-                
-            return result
\ No newline at end of file
+        return result
+    
+    @staticmethod
+    def _is_form_payload(data: Dict) -> bool:
+        """
+        Можно ли отправить данные как form-urlencoded.
+        bool исключен: форма передала бы "True" вместо JSON true.
+        Длинные строки (текст сообщения) исключены: в UTF-8 JSON они короче.
+        """
+        return all(
+            (
+                isinstance(value, (int, float)) and not isinstance(value, bool)
+                or isinstance(value, str) and len(value) <= _FORM_MAX_VALUE_LENGTH
+            )
+            for value in data.values()
+        )
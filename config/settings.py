@@ -118,12 +118,18 @@ DEEPSEEK_MAX_RETRIES = 3
 
 # Telegram Bot настройки
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
-TELEGRAM_POLLING_TIMEOUT = 30
+TELEGRAM_POLLING_TIMEOUT = 30            # Long polling, сек (рекомендуется 25-50, не выше 50)
 TELEGRAM_TYPING_UPDATE_INTERVAL = 5
 TELEGRAM_MAX_MESSAGE_LENGTH = 4096
-TELEGRAM_TYPING_CLEANUP_THRESHOLD = 100  # Порог для очистки завершенных typing задач
 TELEGRAM_API_DEFAULT_TIMEOUT = 10        # Таймаут по умолчанию для API вызовов
-TELEGRAM_MAX_TYPING_TASKS = 1000         # Макс. количество одновременных typing задач
+TELEGRAM_MAX_TYPING_TASKS = 1000         # Макс. количество чатов с активным typing
+TELEGRAM_UPDATE_WORKERS = 4              # Количество параллельных обработчиков обновлений
+TELEGRAM_UPDATE_QUEUE_SIZE = 1000        # Макс. размер очереди каждого обработчика
+TELEGRAM_POLL_CONNECTION_LIMIT = 4       # Макс. соединений для long polling (getUpdates)
+TELEGRAM_API_CONNECTION_LIMIT = 32       # Макс. соединений для исходящих вызовов API
+TELEGRAM_POLLING_RETRY_DELAY = 1.0       # Начальная пауза после ошибки polling (сек)
+TELEGRAM_POLLING_RETRY_MAX_DELAY = 60.0  # Макс. пауза после ошибок polling (сек)
+TELEGRAM_POLLING_RETRY_WARNING_DELAY = 10.0  # Пауза, после которой пишется warning (сек)
 
 # Метрики и адаптивная стратегия
 CACHE_HIT_LOG_INTERVAL = 10
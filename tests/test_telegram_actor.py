@@ -0,0 +1,431 @@
+# pytest tests/test_telegram_actor.py -v
+
+import asyncio
+import time
+import httpx
+import pytest
+from actors import telegram_actor
+from actors.messages import ActorMessage, MESSAGE_TYPES
+from actors.telegram_actor import TelegramInterfaceActor
+from config.messages import USER_MESSAGES
+from config.settings import DAILY_MESSAGE_LIMIT, TELEGRAM_MAX_MESSAGE_LENGTH
+
+
+@pytest.fixture
+def actor():
+    """Актор без запуска polling и HTTP сессий"""
+    return TelegramInterfaceActor()
+
+
+def test_split_short_message(actor):
+    """Короткое сообщение возвращается как есть"""
+    text = "Привет!\n\nКак дела?"
+    assert actor._split_long_message(text) == [text]
+
+
+def test_split_by_paragraphs(actor):
+    """Параграфы объединяются в части не длиннее лимита"""
+    paragraph = "а" * (TELEGRAM_MAX_MESSAGE_LENGTH // 3)
+    text = "\n\n".join([paragraph] * 5)
+
+    chunks = actor._split_long_message(text)
+
+    assert len(chunks) == 3
+    assert chunks[0] == "\n\n".join([paragraph] * 2)
+    assert chunks[2] == paragraph
+    assert all(len(chunk) <= TELEGRAM_MAX_MESSAGE_LENGTH for chunk in chunks)
+
+
+def test_split_long_paragraph_by_words(actor):
+    """Параграф длиннее лимита режется по границам слов"""
+    words = [f"слово{i}" for i in range(TELEGRAM_MAX_MESSAGE_LENGTH // 2)]
+    text = " ".join(words)
+
+    chunks = actor._split_long_message(text)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= TELEGRAM_MAX_MESSAGE_LENGTH for chunk in chunks)
+    # Слова не разрываются и не теряются
+    assert " ".join(chunks).split() == words
+
+
+def test_split_long_word(actor):
+    """Текст без пробелов режется жестко по длине"""
+    text = "x" * (TELEGRAM_MAX_MESSAGE_LENGTH * 2 + 10)
+
+    chunks = actor._split_long_message(text)
+
+    assert [len(chunk) for chunk in chunks] == [
+        TELEGRAM_MAX_MESSAGE_LENGTH,
+        TELEGRAM_MAX_MESSAGE_LENGTH,
+        10
+    ]
+
+
+def test_split_mixed_paragraphs(actor):
+    """Короткие параграфы до и после длинного сохраняют порядок"""
+    long_paragraph = "длинно " * TELEGRAM_MAX_MESSAGE_LENGTH
+    text = f"начало\n\n{long_paragraph}\n\nконец"
+
+    chunks = actor._split_long_message(text)
+
+    assert chunks[0] == "начало"
+    assert chunks[-1] == "конец"
+    assert all(chunk for chunk in chunks)
+    assert all(len(chunk) <= TELEGRAM_MAX_MESSAGE_LENGTH for chunk in chunks)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("text", ["/start", "/start@chimera_bot", "/start@Chimera_Bot", "/start привет"])
+async def test_start_command_variants(actor, text):
+    """Команда /start распознается с упоминанием бота и аргументами"""
+    sent = []
+
+    async def fake_send(chat_id, message_text):
+        sent.append((chat_id, message_text))
+
+    actor._bot_username = "chimera_bot"
+    actor._send_message = fake_send
+    await actor._process_update({
+        "update_id": 1,
+        "message": {"chat": {"id": 42}, "from": {"id": 7}, "text": text}
+    })
+
+    assert sent == [(42, USER_MESSAGES["welcome"].format(
+        DAILY_MESSAGE_LIMIT=DAILY_MESSAGE_LIMIT
+    ))]
+
+
+@pytest.mark.asyncio
+async def test_command_for_other_bot_ignored(actor):
+    """Команда, адресованная другому боту, не обрабатывается"""
+    sent = []
+
+    async def fake_send(chat_id, message_text):
+        sent.append((chat_id, message_text))
+
+    actor.set_actor_system(RecordingActorSystem())
+    actor._bot_username = "chimera_bot"
+    actor._send_message = fake_send
+    await actor._process_update({
+        "update_id": 1,
+        "message": {"chat": {"id": 42}, "from": {"id": 7}, "text": "/start@other_bot"}
+    })
+
+    assert sent == []
+    assert actor._actor_system.sent == []
+    assert not actor._typing_chats
+
+
+@pytest.mark.asyncio
+async def test_unknown_command(actor):
+    """Неизвестная команда получает стандартный ответ"""
+    sent = []
+
+    async def fake_send(chat_id, message_text):
+        sent.append((chat_id, message_text))
+
+    actor._send_message = fake_send
+    await actor._process_update({
+        "update_id": 1,
+        "message": {"chat": {"id": 42}, "from": {"id": 7}, "text": "/help"}
+    })
+
+    assert sent == [(42, USER_MESSAGES["unknown_command"])]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("text, expected_parse_mode", [
+    ("Просто текст, без разметки.", None),
+    ("Текст с *жирным* словом", "Markdown"),
+])
+async def test_send_message_markdown_detection(actor, text, expected_parse_mode):
+    """parse_mode передается только для текста с Markdown разметкой"""
+    calls = []
+
+    async def fake_api_call(method, data=None, **kwargs):
+        calls.append((method, data))
+        return {"ok": True}
+
+    actor._api_call = fake_api_call
+    await actor._send_message(42, text)
+
+    assert len(calls) == 1
+    assert calls[0][1].get("parse_mode") == expected_parse_mode
+
+
+class RecordingActorSystem:
+    """ActorSystem, запоминающий отправленные сообщения"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, actor_id, message):
+        self.sent.append((actor_id, message))
+
+
+@pytest.mark.asyncio
+async def test_process_user_message_forwarded_to_session(actor):
+    """PROCESS_USER_MESSAGE пересылается в UserSessionActor как USER_MESSAGE"""
+    actor_system = RecordingActorSystem()
+    actor.set_actor_system(actor_system)
+    payload = {"user_id": "7", "chat_id": 42, "text": "привет"}
+
+    await actor.handle_message(ActorMessage.create(
+        sender_id="telegram",
+        message_type=MESSAGE_TYPES['PROCESS_USER_MESSAGE'],
+        payload=payload
+    ))
+
+    assert len(actor_system.sent) == 1
+    target, message = actor_system.sent[0]
+    assert target == "user_session"
+    assert message.message_type == MESSAGE_TYPES['USER_MESSAGE']
+    assert message.payload == payload
+
+
+def test_updates_of_one_chat_share_worker_queue(actor):
+    """Обновления одного чата попадают в одну очередь обработчика"""
+    def update(update_id, chat_id):
+        return {"update_id": update_id, "message": {"chat": {"id": chat_id}}}
+
+    queue = actor._update_queue_for(update(1, 42))
+    assert actor._update_queue_for(update(2, 42)) is queue
+    assert actor._update_queue_for(update(3, -42)) in actor._update_queues
+    # Обновление без сообщения не ломает распределение
+    assert actor._update_queue_for({"update_id": 4}) in actor._update_queues
+
+
+# Интервал typing индикатора для тестов планировщика
+TEST_TYPING_INTERVAL = 0.05
+
+
+@pytest.fixture
+def typing_actor(actor, monkeypatch):
+    """Актор с коротким интервалом typing и записью sendChatAction"""
+    monkeypatch.setattr(telegram_actor, "TELEGRAM_TYPING_UPDATE_INTERVAL", TEST_TYPING_INTERVAL)
+    actor.typing_calls = []
+
+    async def fake_api_call(method, data=None, **kwargs):
+        actor.typing_calls.append((time.monotonic(), data["chat_id"]))
+        return {"ok": True}
+
+    actor._api_call = fake_api_call
+    return actor
+
+
+async def _stop_typing_scheduler(actor, task):
+    """Остановка планировщика и отправляемых батчей"""
+    tasks = [task, *actor._typing_batches]
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _calls_for(actor, chat_id):
+    return [at for at, called_chat_id in actor.typing_calls if called_chat_id == chat_id]
+
+
+@pytest.mark.asyncio
+async def test_typing_first_action_is_immediate(typing_actor):
+    """Первый sendChatAction уходит сразу, без ожидания интервала"""
+    task = asyncio.create_task(typing_actor._typing_scheduler())
+    try:
+        started_at = time.monotonic()
+        await typing_actor._start_typing(42)
+        await asyncio.sleep(TEST_TYPING_INTERVAL / 5)
+
+        calls = _calls_for(typing_actor, 42)
+        assert len(calls) == 1
+        assert calls[0] - started_at < TEST_TYPING_INTERVAL / 2
+    finally:
+        await _stop_typing_scheduler(typing_actor, task)
+
+
+@pytest.mark.asyncio
+async def test_typing_stopped_chat_not_refreshed(typing_actor):
+    """После остановки чат больше не получает typing, запись в куче удаляется"""
+    task = asyncio.create_task(typing_actor._typing_scheduler())
+    try:
+        await typing_actor._start_typing(42)
+        await asyncio.sleep(TEST_TYPING_INTERVAL * 1.5)
+        await typing_actor._stop_typing(42)
+        calls_before_stop = len(_calls_for(typing_actor, 42))
+
+        await asyncio.sleep(TEST_TYPING_INTERVAL * 3)
+
+        assert calls_before_stop == 2
+        assert len(_calls_for(typing_actor, 42)) == calls_before_stop
+        # Устаревшая запись удалена из кучи при наступлении дедлайна
+        assert typing_actor._typing_heap == []
+    finally:
+        await _stop_typing_scheduler(typing_actor, task)
+
+
+@pytest.mark.asyncio
+async def test_typing_restarted_chat_not_refreshed_twice(typing_actor):
+    """Перезапущенный чат обновляется только по новому расписанию"""
+    task = asyncio.create_task(typing_actor._typing_scheduler())
+    try:
+        await typing_actor._start_typing(42)
+        await asyncio.sleep(TEST_TYPING_INTERVAL / 2)
+        await typing_actor._stop_typing(42)
+        calls_before_restart = len(_calls_for(typing_actor, 42))
+        await typing_actor._start_typing(42)
+
+        await asyncio.sleep(TEST_TYPING_INTERVAL * 3)
+
+        # Начиная с первой отправки после перезапуска
+        calls = _calls_for(typing_actor, 42)[calls_before_restart:]
+        gaps = [later - earlier for earlier, later in zip(calls, calls[1:])]
+        assert gaps
+        assert all(gap >= TEST_TYPING_INTERVAL * 0.8 for gap in gaps)
+    finally:
+        await _stop_typing_scheduler(typing_actor, task)
+
+
+@pytest.mark.asyncio
+async def test_typing_hung_call_does_not_block_other_chats(typing_actor):
+    """Зависший sendChatAction одного чата не задерживает остальные"""
+    hang = asyncio.Event()
+    calls = typing_actor.typing_calls
+
+    async def fake_api_call(method, data=None, **kwargs):
+        calls.append((time.monotonic(), data["chat_id"]))
+        if data["chat_id"] == 1:
+            await hang.wait()
+        return {"ok": True}
+
+    typing_actor._api_call = fake_api_call
+    task = asyncio.create_task(typing_actor._typing_scheduler())
+    try:
+        await typing_actor._start_typing(1)
+        await asyncio.sleep(TEST_TYPING_INTERVAL / 5)
+        await typing_actor._start_typing(2)
+        await asyncio.sleep(TEST_TYPING_INTERVAL / 5)
+
+        assert len(_calls_for(typing_actor, 2)) == 1
+    finally:
+        await _stop_typing_scheduler(typing_actor, task)
+
+
+@pytest.mark.asyncio
+async def test_typing_failed_call_keeps_restarted_chat(typing_actor):
+    """Ошибка старого sendChatAction не останавливает перезапущенный чат"""
+    calls = typing_actor.typing_calls
+
+    async def fake_api_call(method, data=None, **kwargs):
+        calls.append((time.monotonic(), data["chat_id"]))
+        if len(calls) == 1:
+            await asyncio.sleep(TEST_TYPING_INTERVAL / 2)
+            raise httpx.ConnectError("connection reset")
+        return {"ok": True}
+
+    typing_actor._api_call = fake_api_call
+    task = asyncio.create_task(typing_actor._typing_scheduler())
+    try:
+        await typing_actor._start_typing(42)
+        await asyncio.sleep(TEST_TYPING_INTERVAL / 5)
+        # Пока первый запрос в полете: ответ отправлен, пришло новое сообщение
+        await typing_actor._stop_typing(42)
+        await typing_actor._start_typing(42)
+
+        await asyncio.sleep(TEST_TYPING_INTERVAL * 3)
+
+        assert 42 in typing_actor._typing_chats
+        assert len(_calls_for(typing_actor, 42)) >= 3
+    finally:
+        await _stop_typing_scheduler(typing_actor, task)
+
+
+@pytest.mark.asyncio
+async def test_typing_failed_call_stops_chat(typing_actor):
+    """После ошибки sendChatAction чат больше не обновляется"""
+    calls = typing_actor.typing_calls
+
+    async def fake_api_call(method, data=None, **kwargs):
+        calls.append((time.monotonic(), data["chat_id"]))
+        raise httpx.ConnectError("connection reset")
+
+    typing_actor._api_call = fake_api_call
+    task = asyncio.create_task(typing_actor._typing_scheduler())
+    try:
+        await typing_actor._start_typing(42)
+        await asyncio.sleep(TEST_TYPING_INTERVAL * 3)
+
+        assert 42 not in typing_actor._typing_chats
+        assert len(_calls_for(typing_actor, 42)) == 1
+    finally:
+        await _stop_typing_scheduler(typing_actor, task)
+
+
+@pytest.mark.asyncio
+async def test_typing_limit_evicts_oldest(actor, monkeypatch):
+    """При достижении лимита удаляются самые старые чаты"""
+    monkeypatch.setattr(telegram_actor, "TELEGRAM_MAX_TYPING_TASKS", 10)
+
+    for chat_id in range(10):
+        await actor._start_typing(chat_id)
+    # Повторный запуск делает чат самым новым
+    await actor._start_typing(0)
+    await actor._start_typing(99)
+
+    assert list(actor._typing_chats) == [2, 3, 4, 5, 6, 7, 8, 9, 0, 99]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("data, expected_content_type, expected_body", [
+    # Плоские данные - form-urlencoded
+    ({"chat_id": 42, "action": "typing"},
+     "application/x-www-form-urlencoded", b"chat_id=42&action=typing"),
+    # Длинный текст - JSON: percent-encoding кириллицы втрое длиннее UTF-8
+    ({"chat_id": 42, "text": "Привет, как дела? " * 200},
+     "application/json",
+     ('{"chat_id":42,"text":"' + "Привет, как дела? " * 200 + '"}').encode()),
+    # bool - JSON, иначе форма передала бы "True"
+    ({"chat_id": 42, "disable_notification": True},
+     "application/json", b'{"chat_id":42,"disable_notification":true}'),
+    # Вложенные данные - JSON
+    ({"chat_id": 42, "reply_markup": {"keyboard": [["a"]]}},
+     "application/json", b'{"chat_id":42,"reply_markup":{"keyboard":[["a"]]}}'),
+    # Без данных - пустое тело
+    (None, None, b""),
+])
+async def test_api_call_request_body(actor, data, expected_content_type, expected_body):
+    """Тело запроса выбирается по типу данных"""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"ok": True, "result": True})
+
+    actor._api_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler),
+        base_url=actor._base_url
+    )
+    try:
+        result = await actor._api_call("sendMessage", data=data)
+    finally:
+        await actor._api_client.aclose()
+
+    assert result == {"ok": True, "result": True}
+    assert len(requests) == 1
+    assert requests[0].url.path.endswith("/sendMessage")
+    assert requests[0].headers.get("content-type") == expected_content_type
+    assert requests[0].content == expected_body
+
+
+@pytest.mark.asyncio
+async def test_api_call_raises_on_api_error(actor):
+    """Ответ с ok=false превращается в исключение"""
+    actor._api_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(400, json={"ok": False, "description": "Bad"})
+        ),
+        base_url=actor._base_url
+    )
+    try:
+        with pytest.raises(Exception, match="Telegram API error"):
+            await actor._api_call("sendMessage", data={"chat_id": 42, "text": "x"})
+    finally:
+        await actor._api_client.aclose()